@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import polars as pl
+
+from tooltree import build
+
+
+def test_label_policy_called_once_per_name() -> None:
+    df = pl.DataFrame(
+        {
+            'region': ['north', 'north', 'south', 'south', 'east'],
+            'product': ['other', 'sku one', 'other', 'sku one', 'other'],
+            'm': [1, 2, 3, 4, 5],
+        }
+    )
+    calls: list[str] = []
+
+    def label_policy(name: str) -> str:
+        calls.append(name)
+        return name.upper().replace(' ', '<br>')
+
+    treemap_data = build.create_treemap_data(
+        df,
+        levels=['region', 'product'],
+        metric='m',
+        root='all',
+        label_policy=label_policy,
+    )
+
+    # root name is not passed to the policy, every other name exactly once
+    assert sorted(calls) == ['east', 'north', 'other', 'sku one', 'south']
+
+    # nodes with the same name share the transformed label and title
+    labels = dict(zip(treemap_data['ids'], treemap_data['labels']))
+    assert labels['north__other'] == 'OTHER'
+    assert labels['north__other'] is labels['south__other']
+    assert labels['north__other'] is labels['east__other']
+    assert labels['north__sku one'] == 'SKU<br>ONE'
+    tooltips = dict(zip(treemap_data['ids'], treemap_data['tooltips']))
+    assert tooltips['north__sku one'].startswith('<b>SKU ONE</b> ')
+    assert tooltips['south__sku one'].startswith('<b>SKU ONE</b> ')
+
+
+def test_default_label_policy() -> None:
+    df = pl.DataFrame({'a': ['short', 'a much longer name'], 'm': [1, 2]})
+    treemap_data = build.create_treemap_data(df, levels=['a'], metric='m')
+    assert treemap_data['labels'] == [
+        '',
+        'a<br>much<br>longer<br>name',
+        'short',
+    ]
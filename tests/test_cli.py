@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import os
+
+import polars as pl
+import pytest
+
+from tooltree import cli
+
+
+def _write_example(path: str) -> None:
+    df = pl.DataFrame(
+        {
+            'a': ['x', 'x', 'y', 'z'],
+            'b': ['p', 'q', 'p', 'r'],
+            'm': [1, 2, 3, 4],
+            'e': [10, 20, 30, 40],
+        }
+    )
+    df.write_parquet(path)
+
+
+def test_extra_metrics(tmp_path: str) -> None:
+    input_path = os.path.join(tmp_path, 'one.parquet')
+    _write_example(input_path)
+    html_template = os.path.join(tmp_path, 'out', '{name}.html')
+    cli.run_cli(
+        [
+            input_path,
+            '--levels',
+            'a,b',
+            '--metric',
+            'm',
+            '--extra-metrics',
+            'e',
+            '--html',
+            html_template,
+        ]
+    )
+    with open(os.path.join(tmp_path, 'out', 'one.html')) as f:
+        html = f.read()
+    assert '30.0 e' in html
+
+
+def test_partition_output_names(tmp_path: str) -> None:
+    for region in ['us', 'eu']:
+        os.makedirs(os.path.join(tmp_path, 'hive', 'region=' + region))
+        _write_example(
+            os.path.join(tmp_path, 'hive', 'region=' + region, 'p.parquet')
+        )
+    cli.run_cli(
+        [
+            os.path.join(tmp_path, 'hive', '*', 'p.parquet'),
+            '--levels',
+            'a,b',
+            '--metric',
+            'm',
+            '--html',
+            os.path.join(tmp_path, 'out', '{name}.html'),
+            '--jobs',
+            '2',
+        ]
+    )
+    assert sorted(os.listdir(os.path.join(tmp_path, 'out'))) == [
+        'region=eu.html',
+        'region=us.html',
+    ]
+
+
+def test_duplicate_output_paths(tmp_path: str) -> None:
+    _write_example(os.path.join(tmp_path, 'one.parquet'))
+    pl.read_parquet(os.path.join(tmp_path, 'one.parquet')).write_csv(
+        os.path.join(tmp_path, 'one.csv')
+    )
+    with pytest.raises(SystemExit):
+        cli.run_cli(
+            [
+                os.path.join(tmp_path, 'one.parquet'),
+                os.path.join(tmp_path, 'one.csv'),
+                '--levels',
+                'a',
+                '--metric',
+                'm',
+                '--html',
+                os.path.join(tmp_path, '{name}.html'),
+            ]
+        )
+
+
+def test_parse_inputs() -> None:
+    assert cli._parse_columns('a, ,b,') == ['a', 'b']
+    assert cli._parse_memory_limit('4G') == 4 * 1024**3
+    assert cli._parse_memory_limit('512mb') == 512 * 1024**2
+    with pytest.raises(ValueError):
+        cli._parse_memory_limit('lots')
+
+
+def test_unmatched_glob(tmp_path: str) -> None:
+    _write_example(os.path.join(tmp_path, 'one.parquet'))
+    with pytest.raises(SystemExit):
+        cli.run_cli(
+            [
+                os.path.join(tmp_path, 'one.parquet'),
+                os.path.join(tmp_path, 'missing', '*.parquet'),
+                '--levels',
+                'a',
+                '--metric',
+                'm',
+                '--html',
+                os.path.join(tmp_path, '{name}.html'),
+            ]
+        )
+
+
+def test_csv_partition_levels(tmp_path: str) -> None:
+    for region in ['us', 'eu']:
+        os.makedirs(os.path.join(tmp_path, 'data', 'region=' + region))
+        pl.DataFrame({'a': ['x', 'y'], 'm': [1, 2]}).write_csv(
+            os.path.join(tmp_path, 'data', 'region=' + region, 'p.csv')
+        )
+    df = cli.scan_leaf_totals(
+        os.path.join(tmp_path, 'data'), levels=['region', 'a'], metric='m'
+    )
+    assert sorted(df.rows()) == [
+        ('eu', 'x', 1),
+        ('eu', 'y', 2),
+        ('us', 'x', 1),
+        ('us', 'y', 2),
+    ]
+
+
+def test_mixed_directory(tmp_path: str) -> None:
+    _write_example(os.path.join(tmp_path, 'one.parquet'))
+    pl.read_parquet(os.path.join(tmp_path, 'one.parquet')).write_csv(
+        os.path.join(tmp_path, 'two.csv')
+    )
+    with pytest.raises(ValueError):
+        cli._get_input_format(str(tmp_path))
+
+
+def test_no_label_newlines(tmp_path: str) -> None:
+    input_path = os.path.join(tmp_path, 'one.parquet')
+    pl.DataFrame({'a': ['long node name'], 'm': [1]}).write_parquet(input_path)
+    for flags, name in [([], 'split'), (['--no-label-newlines'], 'kept')]:
+        cli.run_cli(
+            [
+                input_path,
+                '--levels',
+                'a',
+                '--metric',
+                'm',
+                '--html',
+                os.path.join(tmp_path, name + '.html'),
+            ]
+            + flags
+        )
+    assert _read_labels(os.path.join(tmp_path, 'split.html')) == [
+        '',
+        'long<br>node<br>name',
+    ]
+    assert _read_labels(os.path.join(tmp_path, 'kept.html')) == [
+        '',
+        'long node name',
+    ]
+
+
+def _read_labels(html_path: str) -> list[str]:
+    import json
+    import re
+
+    with open(html_path) as f:
+        html = f.read()
+    match = re.search(r'"labels":(\[[^\]]*\])', html)
+    assert match is not None
+    return json.loads(match.group(1))  # type: ignore
+
+
+def test_repeated_input_path(tmp_path: str) -> None:
+    input_path = os.path.join(tmp_path, 'one.parquet')
+    _write_example(input_path)
+    with pytest.raises(SystemExit):
+        cli.run_cli(
+            [
+                input_path,
+                input_path,
+                '--levels',
+                'a',
+                '--metric',
+                'm',
+                '--html',
+                os.path.join(tmp_path, 'out', '{name}.html'),
+                '--jobs',
+                '2',
+            ]
+        )
+    assert not os.path.exists(os.path.join(tmp_path, 'out'))
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+# cold import of tooltree takes about 15ms, plotly.graph_objects about 1s
+import_time_budget_us = 150_000
+
+
+def _run_python(code: str, *flags: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, *flags, '-c', code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_import_time_budget() -> None:
+    result = _run_python('import tooltree', '-X', 'importtime')
+    for line in result.stderr.splitlines():
+        _, cumulative_us, name = line.split('|')
+        if name.strip() == 'tooltree':
+            assert int(cumulative_us) < import_time_budget_us
+            break
+    else:
+        raise AssertionError('tooltree not found in importtime output')
+
+
+def test_import_loads_no_dependencies() -> None:
+    code = """
+import sys
+import tooltree
+
+print(' '.join(sys.modules))
+"""
+    modules = _run_python(code).stdout.split()
+    prefixes = ('plotly', 'polars', 'toolstr', 'tooltree.')
+    for module in modules:
+        assert not module.startswith(prefixes)
+
+
+def test_html_fast_path_loads_no_figure_classes(tmp_path: str) -> None:
+    # plotly.io imports the plotly.graph_objs package, which is lazy, but no
+    # Figure or trace classes should be loaded
+    code = """
+import os
+import sys
+
+import polars as pl
+from tooltree import build, output, visualize
+
+df = pl.DataFrame({'a': ['x', 'y'], 'b': ['p', 'q'], 'm': [1, 2]})
+treemap_data = build.create_treemap_data(df, levels=['a', 'b'], metric='m')
+figure = visualize.create_treemap_figure_dict(treemap_data, metric='m')
+output.export_figure_dict_to_html(figure, os.path.join(sys.argv[1], 'x.html'))
+print(' '.join(sys.modules))
+"""
+    result = subprocess.run(
+        [sys.executable, '-c', code, str(tmp_path)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = result.stdout.split()
+    assert 'plotly.graph_objects' not in modules
+    assert [m for m in modules if m.startswith('plotly.graph_objs.')] == []
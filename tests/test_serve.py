@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import json
+import queue
+import typing
+
+import polars as pl
+
+from tooltree import build
+from tooltree import serve
+from tooltree import types
+
+
+def _build(
+    sizes: list[int],
+    names: list[str] | None = None,
+    metric: str = 'm',
+) -> types.TreemapData:
+    if names is None:
+        names = ['p', 'q', 'r', 's']
+    df = pl.DataFrame(
+        {
+            'a': ['A', 'B', 'B', 'C'][: len(sizes)],
+            'b': names[: len(sizes)],
+            metric: sizes,
+        }
+    )
+    return build.create_treemap_data(
+        df, levels=['a', 'b'], metric=metric, tooltip_fractions=False
+    )
+
+
+def _create_state(metric: str = 'm') -> serve._TreemapState:
+    return serve._TreemapState(
+        {'metric': metric, 'color_nodes': None, 'color_root': None}
+    )
+
+
+def _read_event(subscriber: queue.Queue[str | None]) -> dict[str, typing.Any]:
+    message = subscriber.get_nowait()
+    assert message is not None
+    assert message.startswith('data: ')
+    return json.loads(message[len('data: ') :])  # type: ignore
+
+
+def test_diff_only_sends_changed_nodes() -> None:
+    state = _create_state()
+    subscriber = state.subscribe(version=state.version)
+    state.update(_build([1, 2, 3, 4]))
+    state.update(_build([1, 2, 5, 4]))
+    diff = _read_event(subscriber)
+    assert sorted(diff['upsert'].keys()) == ['', 'B', 'B__r']
+    assert diff['remove'] == []
+    assert 'layout' not in diff
+    assert subscriber.empty()
+
+
+def test_diff_removes_nodes() -> None:
+    state = _create_state()
+    state.update(_build([1, 2, 3, 4]))
+    subscriber = state.subscribe(version=state.version)
+    state.update(_build([1, 2, 3]))
+    diff = _read_event(subscriber)
+    assert sorted(diff['remove']) == ['C', 'C__s']
+    assert sorted(diff['upsert'].keys()) == ['']
+
+
+def test_unchanged_data_sends_nothing() -> None:
+    state = _create_state()
+    state.update(_build([1, 2, 3, 4]))
+    version = state.version
+    subscriber = state.subscribe(version=version)
+    state.update(_build([1, 2, 3, 4]))
+    assert state.version == version
+    assert subscriber.empty()
+
+
+def test_layout_only_diff() -> None:
+    state = _create_state()
+    state.update(_build([1, 2, 3, 4]))
+    subscriber = state.subscribe(version=state.version)
+    state.figure_kwargs['color_branches'] = ['red', 'blue', 'green']
+    state.update(_build([1, 2, 3, 4]))
+    diff = _read_event(subscriber)
+    assert diff['upsert'] == {}
+    assert diff['remove'] == []
+    assert diff['layout'] == {'treemapcolorway': ['red', 'blue', 'green']}
+
+
+def test_subscribe_sends_snapshot_to_stale_clients() -> None:
+    state = _create_state()
+    state.update(_build([1, 2, 3, 4]))
+    current = state.subscribe(version=state.version)
+    assert current.empty()
+    stale = state.subscribe(version=state.version - 1)
+    snapshot = _read_event(stale)
+    assert snapshot['full'] is True
+    assert snapshot['version'] == state.version
+    assert snapshot['remove'] == []
+    assert set(snapshot['upsert'].keys()) == set(state.nodes.keys())
+    assert 'treemapcolorway' in snapshot['layout']
+
+
+def test_page_escapes_node_data() -> None:
+    hostile = '</script><script>alert(1)</script>'
+    state = _create_state(metric='{{version}}')
+    names = [hostile, '{{root}}', 'r', 's']
+    state.update(_build([1, 2, 3, 4], names=names, metric='{{version}}'))
+    page = state.get_page()
+
+    # only the page's own script block is present
+    assert page.count('<script') == 2
+    assert page.count('</script>') == 2
+    assert 'alert(1)' in page
+
+    # inserted values are not rescanned for placeholders
+    assert 'const metric = "{{version}}";' in page
+    assert '/events?version=' + str(state.version) + "'" in page
+    nodes_json = page.split('for (const [id, ...node] of ')[1].split(') {')[0]
+    ids = [node[0] for node in json.loads(nodes_json)]
+    assert 'A__' + hostile in ids
+    assert 'B__{{root}}' in ids
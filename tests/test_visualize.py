@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+
+import plotly.basedatatypes
+import plotly.io as pio
+import polars as pl
+import pytest
+
+from tooltree import build
+from tooltree import visualize
+
+
+def _create_treemap_data(**kwargs: object) -> build.types.TreemapData:
+    df = pl.DataFrame(
+        {
+            'a': ['x', 'x', 'y', 'z'],
+            'b': ['p', 'q', 'p', 'r'],
+            'm': [1, 2, 3, 4],
+            'c': [0.1, 0.2, 0.3, 0.4],
+        }
+    )
+    return build.create_treemap_data(
+        df, levels=['a', 'b'], metric='m', **kwargs
+    )
+
+
+def test_underscore_properties_match_plotly() -> None:
+    assert visualize._underscore_properties == set(
+        plotly.basedatatypes.BaseFigure._valid_underscore_properties.keys()
+    )
+
+
+@pytest.mark.parametrize(
+    'kwargs',
+    [
+        {},
+        {'max_depth': 2, 'height': 500, 'width': 700},
+        {'color_branches': {'x': 'red', 'y': 'blue'}},
+        {'color_nodes': 'c', 'color_bar': True, 'cmap': 'Viridis'},
+        {'color_nodes': 'c', 'color_bar': True, 'cmin': 0, 'cmax': 1},
+        {'color_nodes': 'c', 'cmap': 'magma_r'},
+    ],
+)
+def test_figure_dict_matches_figure(kwargs: dict[str, object]) -> None:
+    if 'color_nodes' in kwargs:
+        treemap_data = _create_treemap_data(
+            color_nodes='c', color_agg=pl.col('c').mean()
+        )
+    else:
+        treemap_data = _create_treemap_data()
+    figure = visualize.create_treemap_figure_dict(
+        treemap_data, metric='m', **kwargs
+    )
+    fig = visualize.create_treemap_figure(treemap_data, metric='m', **kwargs)
+    expected = json.loads(fig.to_json())
+    del expected['layout']['template']
+    assert json.loads(pio.to_json(figure, validate=False)) == expected
+
+
+def test_figure_keeps_free_form_keys() -> None:
+    fig = visualize.create_treemap_figure(
+        _create_treemap_data(), metric='m', trace_kwargs={'meta': {'my_key': 1}}
+    )
+    assert fig.data[0].meta == {'my_key': 1}
+
+
+def test_figure_dict_rejects_unconvertible_values() -> None:
+    with pytest.raises(ValueError):
+        visualize._update_figure_dict({}, {'annotations': [{'font_size': 3}]})
+    with pytest.raises(ValueError):
+        visualize._update_figure_dict({}, {'template': 'plotly_dark'})
@@ -3,7 +3,35 @@
 __version__ = '0.1.3'
 
 import typing
-from .output import plot_treemap
 
 if typing.TYPE_CHECKING:
+    from .output import plot_treemap
     from .types import TreemapData, TreemapPlot
+
+
+_submodules = {
+    'build',
+    'cli',
+    'colors',
+    'defaults',
+    'output',
+    'serve',
+    'types',
+    'visualize',
+}
+
+
+def __getattr__(name: str) -> typing.Any:
+    """import modules on first use to keep import of tooltree fast"""
+    import importlib
+
+    if name == 'plot_treemap':
+        from .output import plot_treemap
+
+        return plot_treemap
+    elif name in _submodules:
+        return importlib.import_module('.' + name, __name__)
+    else:
+        raise AttributeError(
+            'module ' + repr(__name__) + ' has no attribute ' + repr(name)
+        )
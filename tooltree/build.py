@@ -25,6 +25,8 @@ def create_treemap_data(
     color_nodes: str | Mapping[str | tuple[str, ...], typing.Any] | None = None,
     color_agg: pl.Expr | None = None,
     color_root: str | None = None,
+    label_policy: typing.Callable[[str], str] | None = None,
+    tooltip_fractions: bool = True,
 ) -> types.TreemapData:
     import polars as pl
 
@@ -45,6 +47,12 @@ def create_treemap_data(
         'node_colors': [] if color_nodes is not None else None,
     }
 
+    # labels and ids are computed once and shared by all nodes that reuse them
+    if label_policy is None:
+        label_policy = _add_name_newlines
+    labels: dict[str, tuple[str, str]] = {}
+    node_ids: dict[tuple[str, ...], str] = {}
+
     # root node
     _add_treemap_entry(
         treemap_data=treemap_data,
@@ -58,6 +66,10 @@ def create_treemap_data(
         color_nodes=None,
         extra_metrics=None,
         color_root=color_root,
+        label_policy=label_policy,
+        labels=labels,
+        node_ids=node_ids,
+        tooltip_fractions=tooltip_fractions,
     )
 
     # level nodes
@@ -101,6 +113,10 @@ def create_treemap_data(
                     color_nodes=color_nodes,
                     extra_metrics=extra_metrics,
                     color_root=color_root,
+                    label_policy=label_policy,
+                    labels=labels,
+                    node_ids=node_ids,
+                    tooltip_fractions=tooltip_fractions,
                 )
                 children_count.setdefault(ancestors, 0)
                 children_count[ancestors] += 1
@@ -194,20 +210,31 @@ def _add_treemap_entry(
     color_nodes: str | Mapping[str | tuple[str, ...], typing.Any] | None,
     extra_metrics: list[str | pl.Expr] | None = None,
     color_root: str | None,
+    label_policy: typing.Callable[[str], str],
+    labels: dict[str, tuple[str, str]],
+    node_ids: dict[tuple[str, ...], str],
+    tooltip_fractions: bool = True,
 ) -> None:
     # compute identifiers
-    id = '__'.join((ancestors or ()) + (name,))
-    label = _add_name_newlines(name, root=treemap_data['root'])
+    path = (ancestors or ()) + (name,)
+    id = '__'.join(path)
+    node_ids[path] = id
+    label, title = _get_label(
+        name,
+        root=treemap_data['root'],
+        label_policy=label_policy,
+        labels=labels,
+    )
     if ancestors is None:
         parent_id = ''
     elif ancestors == ():
         parent_id = treemap_data['root']
     else:
-        parent_id = '__'.join(ancestors)
+        parent_id = node_ids[ancestors]
 
     # create tooltip
     tooltip = _create_tooltip(
-        name=label,
+        title=title,
         ancestors=ancestors,
         parent_size=parent_size,
         size=size,
@@ -215,6 +242,7 @@ def _add_treemap_entry(
         metric_format=metric_format,
         entry=entry,
         extra_metrics=extra_metrics,
+        fractions=tooltip_fractions,
     )
 
     # compute color value
@@ -236,13 +264,30 @@ def _add_treemap_entry(
         treemap_data['node_colors'].append(color_value)
 
 
-def _add_name_newlines(name: str, root: str) -> str:
+def _get_label(
+    name: str,
+    *,
+    root: str,
+    label_policy: typing.Callable[[str], str],
+    labels: dict[str, tuple[str, str]],
+) -> tuple[str, str]:
+    """get (label, tooltip title) of name, computing it on first use"""
+    cached = labels.get(name)
+    if cached is not None:
+        return cached
     if name is None:
         raise Exception('name is None')
-    newline_exceptions: list[str] = []
     if name == root:
-        return name
-    if len(name) > 8 and name not in newline_exceptions:
+        label = name
+    else:
+        label = label_policy(name)
+    title = '<b>' + label.replace('<br>', ' ') + '</b>'
+    labels[name] = (label, title)
+    return label, title
+
+
+def _add_name_newlines(name: str) -> str:
+    if len(name) > 8:
         name = name.replace(' ', '<br>')
     if '<br>V' in name:
         name = name.replace('<br>V', ' V')
@@ -250,7 +295,7 @@ def _add_name_newlines(name: str, root: str) -> str:
 
 
 def _create_tooltip(
-    name: str,
+    title: str,
     ancestors: tuple[str, ...] | None,
     parent_size: int | float | None,
     size: int | float,
@@ -258,10 +303,12 @@ def _create_tooltip(
     metric_format: dict[str, typing.Any] | None,
     entry: dict[str, typing.Any] | None,
     extra_metrics: list[str | pl.Expr] | None = None,
+    fractions: bool = True,
 ) -> str:
+    import polars as pl
     import toolstr
 
-    tooltip = '<b>' + name.replace('<br>', ' ') + '</b>'
+    tooltip = title
 
     # add size to tooltip
     if metric_format is None:
@@ -269,13 +316,15 @@ def _create_tooltip(
     tooltip += ' ' + toolstr.format(size, **metric_format)
 
     # add percentage to tooltip
-    fraction = size / treemap_data['total_size']
-    fraction_str = toolstr.format(fraction, percentage=True, decimals=1)
-    tooltip += '<br>' + fraction_str + ' of ' + treemap_data['metric']
+    if fractions:
+        fraction = size / treemap_data['total_size']
+        fraction_str = toolstr.format(fraction, percentage=True, decimals=1)
+        tooltip += '<br>' + fraction_str + ' of ' + treemap_data['metric']
 
     # add parent percentage to tooltip
     if (
-        ancestors is not None
+        fractions
+        and ancestors is not None
         and len(ancestors) >= 1
         and parent_size is not None
     ):
@@ -0,0 +1,438 @@
+from __future__ import annotations
+
+import argparse
+import typing
+
+from . import build
+from . import output
+from . import visualize
+
+if typing.TYPE_CHECKING:
+    import polars as pl
+
+
+_memory_units = {
+    'B': 1,
+    'K': 1024,
+    'KB': 1024,
+    'M': 1024**2,
+    'MB': 1024**2,
+    'G': 1024**3,
+    'GB': 1024**3,
+    'T': 1024**4,
+    'TB': 1024**4,
+}
+
+
+def run_cli(raw_args: list[str] | None = None) -> None:
+    """render treemaps of parquet / csv files from the command line"""
+    parser = _create_parser()
+    args = parser.parse_args(raw_args)
+
+    # parse inputs
+    try:
+        paths = _expand_paths(args.paths)
+        for path in paths:
+            _get_input_format(path)
+    except ValueError as e:
+        parser.error(str(e))
+    levels = _parse_columns(args.levels)
+    if len(levels) == 0:
+        parser.error('specify at least one column with --levels')
+    extra_metrics = _parse_columns(args.extra_metrics)
+    if args.html is None and args.png is None:
+        parser.error('specify an output path with --html or --png')
+    if len(paths) > 1:
+        for template in [args.html, args.png]:
+            if template is not None and '{name}' not in template:
+                parser.error(
+                    'output paths must contain {name} when rendering '
+                    'multiple inputs'
+                )
+    names = _get_input_names(paths)
+    for template in [args.html, args.png]:
+        if template is not None:
+            outputs = [template.format(name=names[path]) for path in paths]
+            for output_path in set(outputs):
+                if outputs.count(output_path) > 1:
+                    parser.error(
+                        'multiple inputs would write to ' + output_path
+                    )
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    if args.memory_limit is not None:
+        try:
+            memory_limit: int | None = _parse_memory_limit(args.memory_limit)
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        memory_limit = None
+
+    # render each input in the same process
+    kwargs: dict[str, typing.Any] = dict(
+        levels=levels,
+        metric=args.metric,
+        extra_metrics=extra_metrics,
+        root=args.root,
+        max_children=args.max_children,
+        min_child_fraction=args.min_child_fraction,
+        max_root_children=args.max_root_children,
+        min_root_child_fraction=args.min_root_child_fraction,
+        label_policy=_keep_name if args.no_label_newlines else None,
+        max_depth=args.max_depth,
+        height=args.height,
+        width=args.width,
+        html_template=args.html,
+        png_template=args.png,
+        memory_limit=memory_limit,
+        jobs=args.jobs,
+    )
+    if args.jobs == 1:
+        for path in paths:
+            render_file(path, name=names[path], **kwargs)
+    else:
+        import concurrent.futures
+
+        with concurrent.futures.ThreadPoolExecutor(args.jobs) as executor:
+            futures = [
+                executor.submit(render_file, path, name=names[path], **kwargs)
+                for path in paths
+            ]
+            for future in futures:
+                future.result()
+
+
+def _create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='tooltree',
+        description='render treemaps of parquet or csv files',
+    )
+    parser.add_argument(
+        'paths',
+        nargs='+',
+        help='files, globs, or partition directories to render',
+    )
+    parser.add_argument(
+        '--levels',
+        required=True,
+        help='comma-separated columns to use as treemap levels',
+    )
+    parser.add_argument('--metric', required=True, help='column of sizes')
+    parser.add_argument(
+        '--extra-metrics',
+        help='comma-separated columns to sum and show in tooltips',
+    )
+    parser.add_argument('--root', default='', help='name of root node')
+    parser.add_argument('--max-children', type=int)
+    parser.add_argument('--min-child-fraction', type=float)
+    parser.add_argument('--max-root-children', type=int)
+    parser.add_argument('--min-root-child-fraction', type=float)
+    parser.add_argument(
+        '--no-label-newlines',
+        action='store_true',
+        help='keep long node names on one line',
+    )
+    parser.add_argument('--max-depth', type=int)
+    parser.add_argument('--height', type=int)
+    parser.add_argument('--width', type=int)
+    parser.add_argument(
+        '--html',
+        help='html output path, {name} is replaced by the input name',
+    )
+    parser.add_argument(
+        '--png',
+        help='png output path, {name} is replaced by the input name',
+    )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='number of inputs to render in parallel',
+    )
+    parser.add_argument(
+        '--memory-limit',
+        help='use streaming aggregation for inputs whose size on disk is '
+        'larger than this (e.g. 500MB, 4G), shared across jobs. parquet is '
+        'compressed, so set this well below the available memory',
+    )
+    return parser
+
+
+def _keep_name(name: str) -> str:
+    return name
+
+
+def _expand_paths(raw_paths: list[str]) -> list[str]:
+    import glob
+
+    paths = []
+    for raw_path in raw_paths:
+        if glob.has_magic(raw_path):
+            matches = sorted(glob.glob(raw_path))
+            if len(matches) == 0:
+                raise ValueError('no files match ' + raw_path)
+            paths.extend(matches)
+        else:
+            paths.append(raw_path)
+    return paths
+
+
+def _parse_columns(raw_columns: str | None) -> list[str]:
+    if raw_columns is None:
+        return []
+    columns = [column.strip() for column in raw_columns.split(',')]
+    return [column for column in columns if column != '']
+
+
+def _parse_memory_limit(raw_limit: str) -> int:
+    raw_limit = raw_limit.strip().upper()
+    for unit in sorted(_memory_units.keys(), key=len, reverse=True):
+        if raw_limit.endswith(unit):
+            number = raw_limit[: -len(unit)]
+            multiplier = _memory_units[unit]
+            break
+    else:
+        number = raw_limit
+        multiplier = 1
+    try:
+        return int(float(number) * multiplier)
+    except ValueError:
+        raise ValueError('invalid memory limit: ' + str(raw_limit))
+
+
+def render_file(
+    path: str,
+    *,
+    levels: list[str],
+    metric: str,
+    name: str | None = None,
+    extra_metrics: list[str] | None = None,
+    root: str = '',
+    max_children: int | None = None,
+    min_child_fraction: float | None = None,
+    max_root_children: int | None = None,
+    min_root_child_fraction: float | None = None,
+    label_policy: typing.Callable[[str], str] | None = None,
+    max_depth: int | None = None,
+    height: int | None = None,
+    width: int | None = None,
+    html_template: str | None = None,
+    png_template: str | None = None,
+    memory_limit: int | None = None,
+    jobs: int = 1,
+) -> None:
+    """render treemap of a single file or partition directory
+
+    name replaces {name} in output templates, default is the input's basename
+    """
+    import os
+
+    # decide whether data fits within memory budget of this job
+    if memory_limit is not None:
+        streaming = _get_input_size(path) > memory_limit / jobs
+    else:
+        streaming = False
+
+    # aggregate leaf nodes before building treemap
+    df = scan_leaf_totals(
+        path,
+        levels=levels,
+        metric=metric,
+        extra_metrics=extra_metrics,
+        streaming=streaming,
+    )
+
+    # build treemap
+    treemap_data = build.create_treemap_data(
+        df,
+        levels=levels,
+        metric=metric,
+        extra_metrics=list(extra_metrics or []),
+        root=root,
+        max_children=max_children,
+        min_child_fraction=min_child_fraction,
+        max_root_children=max_root_children,
+        min_root_child_fraction=min_root_child_fraction,
+        label_policy=label_policy,
+    )
+    figure = visualize.create_treemap_figure_dict(
+        treemap_data,
+        metric=metric,
+        max_depth=max_depth,
+        height=height,
+        width=width,
+    )
+
+    # render outputs, only png output needs a plotly Figure
+    if name is None:
+        name = _get_input_names([path])[path]
+    if html_template is not None:
+        html_path = os.path.abspath(html_template.format(name=name))
+        print('writing treemap html to', html_path)
+        output.export_figure_dict_to_html(figure, html_path=html_path)
+    if png_template is not None:
+        import plotly.graph_objects as go  # type: ignore
+
+        png_path = os.path.abspath(png_template.format(name=name))
+        print('writing treemap png to', png_path)
+        output.export_figure_to_png(
+            go.Figure(figure), png_path=png_path, height=height, width=width
+        )
+
+
+def scan_leaf_totals(
+    path: str,
+    *,
+    levels: list[str],
+    metric: str,
+    extra_metrics: list[str] | None = None,
+    streaming: bool = False,
+) -> pl.DataFrame:
+    """lazily read only the needed columns and sum them per leaf node
+
+    summing per leaf gives the same treemap as the raw rows, because every
+    level of the treemap is a sum over leaves
+    """
+    import polars as pl
+
+    min_column = '__tooltree_min_' + metric
+    metric_aggs = [
+        pl.col(column).sum() for column in [metric] + list(extra_metrics or [])
+    ]
+    metric_aggs.append(pl.col(metric).min().alias(min_column))
+    lf = (
+        _scan_input(path)
+        .select(*levels, metric, *(extra_metrics or []))
+        .group_by(*levels)
+        .agg(*metric_aggs)
+    )
+    if streaming:
+        df = lf.collect(engine='streaming')
+    else:
+        df = lf.collect()
+
+    if len(df.filter(pl.col(min_column) < 0)) > 0:
+        raise Exception('metric column contains negative values')
+    return df.drop(min_column)
+
+
+def _scan_input(path: str) -> pl.LazyFrame:
+    import os
+    import polars as pl
+
+    input_format = _get_input_format(path)
+    if os.path.isdir(path) and input_format == 'csv':
+        # scan_csv() does not support hive partitioning
+        return pl.concat(
+            [
+                _scan_csv_partition(path, file)
+                for file in sorted(_list_files(path, '.csv'))
+            ],
+            how='vertical_relaxed',
+        )
+    elif os.path.isdir(path):
+        return pl.scan_parquet(
+            os.path.join(path, '**', '*.parquet'), hive_partitioning=True
+        )
+    elif input_format == 'csv':
+        return pl.scan_csv(path)
+    else:
+        return pl.scan_parquet(path)
+
+
+def _scan_csv_partition(directory: str, path: str) -> pl.LazyFrame:
+    """scan csv file, adding key=value directory names as columns"""
+    import os
+    import polars as pl
+
+    relative = os.path.relpath(os.path.dirname(path), directory)
+    partitions = [
+        part.split('=', 1) for part in relative.split(os.sep) if '=' in part
+    ]
+    return pl.scan_csv(path).with_columns(
+        pl.lit(value).alias(key) for key, value in partitions
+    )
+
+
+def _get_input_format(path: str) -> str:
+    import os
+
+    if os.path.isdir(path):
+        has_csv = len(_list_files(path, '.csv')) > 0
+        has_parquet = len(_list_files(path, '.parquet')) > 0
+        if has_csv and has_parquet:
+            raise ValueError(
+                'directory has both csv and parquet files: ' + path
+            )
+        elif has_csv:
+            return 'csv'
+        elif has_parquet:
+            return 'parquet'
+        else:
+            raise ValueError('directory has no csv or parquet files: ' + path)
+    elif path.endswith('.csv'):
+        return 'csv'
+    elif path.endswith('.parquet'):
+        return 'parquet'
+    else:
+        raise ValueError('unknown file type: ' + str(path))
+
+
+def _list_files(directory: str, extension: str) -> list[str]:
+    import os
+
+    return [
+        os.path.join(parent, filename)
+        for parent, _, filenames in os.walk(directory)
+        for filename in filenames
+        if filename.endswith(extension)
+    ]
+
+
+def _get_input_size(path: str) -> int:
+    import os
+
+    if os.path.isdir(path):
+        files = _list_files(path, '.csv') + _list_files(path, '.parquet')
+        return sum(os.path.getsize(file) for file in files)
+    else:
+        return os.path.getsize(path)
+
+
+def _get_input_names(paths: list[str]) -> dict[str, str]:
+    """name each input by the parts of its path that differ between inputs
+
+    e.g. hive/region=us/p.parquet and hive/region=eu/p.parquet are named
+    region=us and region=eu
+    """
+    import os
+
+    all_parts = {}
+    for path in paths:
+        parts = os.path.normpath(os.path.abspath(path)).split(os.sep)
+        for extension in ['.parquet', '.csv']:
+            if parts[-1].endswith(extension):
+                parts[-1] = parts[-1][: -len(extension)]
+        all_parts[path] = parts
+    if len(paths) == 1:
+        return {paths[0]: all_parts[paths[0]][-1]}
+
+    # remove leading and trailing parts shared by all inputs
+    parts_lists = list(all_parts.values())
+    while all(
+        len(parts) > 1 and parts[0] == parts_lists[0][0]
+        for parts in parts_lists
+    ):
+        parts_lists = [parts[1:] for parts in parts_lists]
+    while all(
+        len(parts) > 1 and parts[-1] == parts_lists[0][-1]
+        for parts in parts_lists
+    ):
+        parts_lists = [parts[:-1] for parts in parts_lists]
+    return {
+        path: '/'.join(parts) for path, parts in zip(all_parts, parts_lists)
+    }
+
+
+if __name__ == '__main__':
+    run_cli()
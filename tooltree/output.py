@@ -26,6 +26,7 @@ def plot_treemap(
     min_child_fraction: float | None = None,
     max_root_children: int | None = None,
     min_root_child_fraction: float | None = None,
+    label_policy: typing.Callable[[str], str] | None = None,
     #
     # visualization
     height: int | None = None,
@@ -62,6 +63,12 @@ def plot_treemap(
         - column name of node color values
     4. color_nodes: dict[str | tuple[str, ...], Color | None]
         - map from node name to color
+
+    Specifying labels:
+    - label_policy: Callable[[str], str]
+        - converts a node name into its display label
+        - called once per distinct name, result is shared by all such nodes
+        - default puts each word of names longer than 8 chars on its own line
     """
     treemap_data = build.create_treemap_data(
         df,
@@ -77,6 +84,7 @@ def plot_treemap(
         color_nodes=color_nodes,
         color_agg=color_agg,
         color_root=color_root,
+        label_policy=label_policy,
     )
     fig = visualize.create_treemap_figure(
         treemap_data=treemap_data,
@@ -140,6 +148,46 @@ def export_figure_to_html(fig: go.Figure, html_path: str) -> None:
     # fig.write_html(output_path, include_plotlyjs='cdn', full_html=True)
 
 
+def export_figure_dict_to_html(
+    figure: dict[str, typing.Any], html_path: str
+) -> None:
+    """write figure dict to html without constructing a plotly Figure"""
+    import os
+    import plotly.io as pio  # type: ignore
+
+    figure = dict(figure, layout=dict(figure.get('layout', {})))
+    if 'template' not in figure['layout']:
+        template = _load_default_template()
+        if template is not None:
+            figure['layout']['template'] = template
+
+    os.makedirs(os.path.dirname(html_path), exist_ok=True)
+    pio.write_html(
+        figure, html_path, validate=False, config={'displayModeBar': False}
+    )
+
+
+def _load_default_template() -> dict[str, typing.Any] | None:
+    """load plotly's default template from json instead of graph objects"""
+    import json
+    import pkgutil
+    import plotly.io as pio
+
+    name = pio.templates.default
+    if not isinstance(name, str) or name == 'none':
+        return None
+    if '+' not in name:
+        try:
+            raw = pkgutil.get_data(
+                'plotly', 'package_data/templates/' + name + '.json'
+            )
+        except OSError:
+            raw = None
+        if raw is not None:
+            return json.loads(raw)  # type: ignore
+    return pio.templates[name].to_plotly_json()  # type: ignore
+
+
 def export_figure_to_png(
     fig: go.Figure,
     png_path: str,
@@ -0,0 +1,413 @@
+from __future__ import annotations
+
+import http.server
+import threading
+import typing
+
+from . import build
+from . import colors
+from . import types
+from . import visualize
+
+if typing.TYPE_CHECKING:
+    import queue
+    from typing import Mapping
+    import polars as pl
+
+
+# node state sent to client: [label, parent, size, tooltip_head, tooltip_tail,
+# color], percentage lines of tooltips are computed by the client from sizes
+Node = typing.List[typing.Any]
+
+
+def serve_treemap(
+    load_data: typing.Callable[[], pl.DataFrame],
+    *,
+    levels: list[str],
+    metric: str,
+    extra_metrics: list[str | pl.Expr] | None = None,
+    root: str = '',
+    metric_format: dict[str, typing.Any] | None = None,
+    max_children: int | None = None,
+    min_child_fraction: float | None = None,
+    max_root_children: int | None = None,
+    min_root_child_fraction: float | None = None,
+    color_nodes: str | Mapping[str | tuple[str, ...], typing.Any] | None = None,
+    color_agg: pl.Expr | None = None,
+    color_root: str | None = None,
+    label_policy: typing.Callable[[str], str] | None = None,
+    figure_kwargs: dict[str, typing.Any] | None = None,
+    interval: float = 60.0,
+    host: str = '127.0.0.1',
+    port: int = 8050,
+) -> None:
+    """serve a live treemap that refreshes from load_data() every interval
+
+    the page and plotly.js are sent once, after which only changed nodes are
+    pushed to the browser as server-sent events and applied with Plotly.react
+
+    tooltip percentages of total and of parent are computed in the browser,
+    so a change in one node's size does not resend its siblings
+
+    figure_kwargs are passed to visualize.create_treemap_figure()
+    """
+    data_kwargs: dict[str, typing.Any] = dict(
+        levels=levels,
+        metric=metric,
+        extra_metrics=extra_metrics,
+        root=root,
+        metric_format=metric_format,
+        max_children=max_children,
+        min_child_fraction=min_child_fraction,
+        max_root_children=max_root_children,
+        min_root_child_fraction=min_root_child_fraction,
+        color_nodes=color_nodes,
+        color_agg=color_agg,
+        color_root=color_root,
+        label_policy=label_policy,
+        tooltip_fractions=False,
+    )
+    figure_kwargs = dict(figure_kwargs or {})
+    figure_kwargs.update(
+        metric=metric, color_nodes=color_nodes, color_root=color_root
+    )
+
+    state = _TreemapState(figure_kwargs)
+    state.update(build.create_treemap_data(load_data(), **data_kwargs))
+
+    # recompute treemap data in background
+    stop = threading.Event()
+
+    def refresh() -> None:
+        while not stop.wait(interval):
+            try:
+                treemap_data = build.create_treemap_data(
+                    load_data(), **data_kwargs
+                )
+            except Exception as e:
+                print('could not refresh treemap:', repr(e))
+                continue
+            state.update(treemap_data)
+
+    refresh_thread = threading.Thread(target=refresh, daemon=True)
+    refresh_thread.start()
+
+    # serve page and events
+    handler = type('Handler', (_TreemapRequestHandler,), {'state': state})
+    server = http.server.ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    print('serving treemap at http://' + host + ':' + str(port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        state.close()
+        server.server_close()
+
+
+class _TreemapState:
+    """latest treemap nodes and the clients subscribed to their changes"""
+
+    def __init__(self, figure_kwargs: dict[str, typing.Any]) -> None:
+        self.figure_kwargs = figure_kwargs
+        self.lock = threading.Lock()
+        self.version = 0
+        self.treemap_data: types.TreemapData | None = None
+        self.nodes: dict[str, Node] = {}
+        self.layout: dict[str, typing.Any] = {}
+        self.page: str | None = None
+        self.subscribers: list[queue.Queue[str | None]] = []
+
+    def update(self, treemap_data: types.TreemapData) -> None:
+        nodes = _get_nodes(treemap_data)
+        _, layout = colors._get_color_kwargs(
+            treemap_data=treemap_data,
+            metric=self.figure_kwargs['metric'],
+            color_branches=self.figure_kwargs.get('color_branches'),
+            color_nodes=self.figure_kwargs.get('color_nodes'),
+            color_root=self.figure_kwargs.get('color_root'),
+        )
+        with self.lock:
+            initial = self.treemap_data is None
+            self.treemap_data = treemap_data
+            diff = _diff_nodes(self.nodes, nodes)
+            if layout != self.layout:
+                diff['layout'] = layout
+            elif len(diff['upsert']) == 0 and len(diff['remove']) == 0:
+                return
+            self.version += 1
+            self.nodes = nodes
+            self.layout = layout
+            self.page = None
+            if not initial:
+                diff['version'] = self.version
+                message = _encode_event(diff)
+                for subscriber in self.subscribers:
+                    subscriber.put(message)
+
+    def get_page(self) -> str:
+        import json
+
+        with self.lock:
+            if self.page is None:
+                assert self.treemap_data is not None
+                fig = visualize.create_treemap_figure(
+                    self.treemap_data, **self.figure_kwargs
+                )
+                fig.update_layout(uirevision='tooltree')
+
+                # node arrays are filled in by the client from nodes
+                figure = json.loads(fig.to_json())
+                trace = figure['data'][0]
+                for key in ['ids', 'labels', 'parents', 'values', 'customdata']:
+                    trace[key] = []
+                if 'colors' in trace.get('marker', {}):
+                    trace['marker']['colors'] = []
+                nodes = [[id] + node for id, node in self.nodes.items()]
+
+                self.page = _fill_page_template(
+                    figure=_encode_script_json(figure),
+                    nodes=_encode_script_json(nodes),
+                    root=_encode_script_json(self.treemap_data['root']),
+                    metric=_encode_script_json(self.treemap_data['metric']),
+                    version=str(self.version),
+                )
+            return self.page
+
+    def subscribe(self, version: int) -> queue.Queue[str | None]:
+        import queue
+
+        subscriber: queue.Queue[str | None] = queue.Queue()
+        with self.lock:
+            if version != self.version:
+                snapshot = {
+                    'version': self.version,
+                    'full': True,
+                    'upsert': self.nodes,
+                    'remove': [],
+                    'layout': self.layout,
+                }
+                subscriber.put(_encode_event(snapshot))
+            self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue[str | None]) -> None:
+        with self.lock:
+            self.subscribers.remove(subscriber)
+
+    def close(self) -> None:
+        with self.lock:
+            for subscriber in self.subscribers:
+                subscriber.put(None)
+
+
+def _get_nodes(treemap_data: types.TreemapData) -> dict[str, Node]:
+    node_colors = treemap_data['node_colors']
+    if node_colors is None:
+        node_colors = [None] * len(treemap_data['ids'])
+    # tooltip heads never contain <br>, because titles replace it with spaces
+    return {
+        id: [label, parent, size, head, sep + tail, color]
+        for id, label, parent, size, (head, sep, tail), color in zip(
+            treemap_data['ids'],
+            treemap_data['labels'],
+            treemap_data['parents'],
+            treemap_data['sizes'],
+            (tooltip.partition('<br>') for tooltip in treemap_data['tooltips']),
+            node_colors,
+        )
+    }
+
+
+def _diff_nodes(
+    old_nodes: dict[str, Node], new_nodes: dict[str, Node]
+) -> dict[str, typing.Any]:
+    """return the nodes that were added, changed, or removed"""
+    upsert = {
+        id: node
+        for id, node in new_nodes.items()
+        if old_nodes.get(id) != node
+    }
+    remove = [id for id in old_nodes.keys() if id not in new_nodes]
+    return {'upsert': upsert, 'remove': remove}
+
+
+def _encode_script_json(data: typing.Any) -> str:
+    """encode json for an inline <script>, escaping html like plotly does"""
+    import json
+
+    return (
+        json.dumps(data, default=float)
+        .replace('<', '\\u003c')
+        .replace('>', '\\u003e')
+        .replace('&', '\\u0026')
+    )
+
+
+def _fill_page_template(**values: str) -> str:
+    """fill {{name}} placeholders in one pass, so values are not rescanned"""
+    import re
+
+    return re.sub(
+        r'\{\{(\w+)\}\}',
+        lambda match: values[match.group(1)],
+        _page_template,
+    )
+
+
+def _encode_event(data: dict[str, typing.Any]) -> str:
+    import json
+
+    return 'data: ' + json.dumps(data, default=float) + '\n\n'
+
+
+class _TreemapRequestHandler(http.server.BaseHTTPRequestHandler):
+    state: _TreemapState
+
+    def do_GET(self) -> None:
+        import urllib.parse
+
+        url = urllib.parse.urlparse(self.path)
+        if url.path == '/':
+            self._send_body(self.state.get_page(), 'text/html')
+        elif url.path == '/plotly.min.js':
+            from plotly.offline import get_plotlyjs  # type: ignore
+
+            self._send_body(
+                get_plotlyjs(),
+                'application/javascript',
+                cache_control='public, max-age=86400',
+            )
+        elif url.path == '/events':
+            query = urllib.parse.parse_qs(url.query)
+            try:
+                version = int(query.get('version', ['-1'])[0])
+            except ValueError:
+                version = -1
+            self._send_events(version)
+        else:
+            self.send_error(404)
+
+    def _send_body(
+        self, body: str, content_type: str, cache_control: str = 'no-cache'
+    ) -> None:
+        encoded = body.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', content_type + '; charset=utf-8')
+        self.send_header('Content-Length', str(len(encoded)))
+        self.send_header('Cache-Control', cache_control)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def _send_events(self, version: int) -> None:
+        import queue
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        subscriber = self.state.subscribe(version)
+        try:
+            while True:
+                try:
+                    message = subscriber.get(timeout=15)
+                except queue.Empty:
+                    message = ': keepalive\n\n'
+                if message is None:
+                    break
+                self.wfile.write(message.encode())
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.state.unsubscribe(subscriber)
+
+    def log_message(self, format: str, *args: typing.Any) -> None:
+        pass
+
+
+_page_template = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<script src="/plotly.min.js"></script>
+<style>html, body, #treemap { margin: 0; height: 100%; }</style>
+</head>
+<body>
+<div id="treemap"></div>
+<script>
+const fig = {{figure}};
+const root = {{root}};
+const metric = {{metric}};
+const trace = fig.data[0];
+const hasColors = (
+    trace.marker !== undefined && trace.marker.colors !== undefined
+);
+const nodes = new Map();
+for (const [id, ...node] of {{nodes}}) {
+    nodes.set(id, node);
+}
+
+function formatPercentage(numerator, denominator) {
+    return (100 * numerator / denominator).toFixed(1) + '%';
+}
+
+function createTooltip(id, node) {
+    const [label, parent, size, head, tail] = node;
+    const total = nodes.get(root)[2];
+    let tooltip = head;
+    tooltip += '<br>' + formatPercentage(size, total) + ' of ' + metric;
+    if (id !== root && parent !== root && nodes.has(parent)) {
+        const parentNode = nodes.get(parent);
+        const grandparent = parentNode[1];
+        const name = grandparent === root
+            ? parent
+            : parent.slice(grandparent.length + 2);
+        const percentage = formatPercentage(size, parentNode[2]);
+        tooltip += '<br>' + percentage + ' of ' + name;
+    }
+    return tooltip + tail;
+}
+
+function render() {
+    const ids = [], labels = [], parents = [], values = [], customdata = [];
+    const markerColors = [];
+    for (const [id, node] of nodes) {
+        ids.push(id);
+        labels.push(node[0]);
+        parents.push(node[1]);
+        values.push(node[2]);
+        customdata.push(createTooltip(id, node));
+        markerColors.push(node[5]);
+    }
+    Object.assign(trace, {ids, labels, parents, values, customdata});
+    if (hasColors) {
+        trace.marker.colors = markerColors;
+    }
+    Plotly.react('treemap', fig.data, fig.layout, {displayModeBar: false});
+}
+
+render();
+const events = new EventSource('/events?version={{version}}');
+events.onmessage = (event) => {
+    const diff = JSON.parse(event.data);
+    if (diff.full) {
+        nodes.clear();
+    }
+    for (const id of diff.remove) {
+        nodes.delete(id);
+    }
+    for (const [id, node] of Object.entries(diff.upsert)) {
+        nodes.set(id, node);
+    }
+    if (diff.layout) {
+        Object.assign(fig.layout, diff.layout);
+    }
+    render();
+};
+</script>
+</body>
+</html>
+"""
@@ -92,3 +92,167 @@ def create_treemap_figure(
         fig.update_traces(**trace_kwargs)
 
     return fig
+
+
+def create_treemap_figure_dict(
+    treemap_data: types.TreemapData,
+    *,
+    metric: str,
+    color_branches: list[str] | dict[str, str | None] | None = None,
+    color_nodes: str | Mapping[str | tuple[str, ...], typing.Any] | None = None,
+    color_root: str | None = None,
+    cmap: str | None = None,
+    cmin: int | float | None = None,
+    cmid: int | float | None = None,
+    cmax: int | float | None = None,
+    color_bar: bool = False,
+    height: int | None = None,
+    width: int | None = None,
+    max_depth: int | None = None,
+) -> dict[str, typing.Any]:
+    """create plotly figure as a plain dict, without importing plotly
+
+    this mirrors create_treemap_figure() for tooltree's own options only,
+    arbitrary plotly kwargs need create_treemap_figure() to be validated
+    """
+
+    # get color kwargs
+    treemap_color_kwargs, layout_color_kwargs = colors._get_color_kwargs(
+        treemap_data=treemap_data,
+        color_branches=color_branches,
+        color_nodes=color_nodes,
+        color_root=color_root,
+        cmap=cmap,
+        cmin=cmin,
+        cmid=cmid,
+        cmax=cmax,
+        color_bar=color_bar,
+        metric=metric,
+    )
+
+    # compile general treemap kwargs
+    treemap_object_kwargs = {
+        'maxdepth': max_depth,
+        'textfont': dict(family='monospace', size=20),
+    }
+
+    # generate trace
+    trace: dict[str, typing.Any] = {
+        'type': 'treemap',
+        'ids': treemap_data['ids'],
+        'labels': treemap_data['labels'],
+        'parents': treemap_data['parents'],
+        'values': treemap_data['sizes'],
+        'customdata': treemap_data['tooltips'],
+        'branchvalues': 'total',
+    }
+    _update_figure_dict(trace, treemap_object_kwargs)
+    _update_figure_dict(trace, treemap_color_kwargs)
+
+    # update layout
+    layout: dict[str, typing.Any] = {}
+    _update_figure_dict(
+        layout,
+        dict(
+            margin=dict(l=0, r=0, b=0, t=0),
+            height=height,
+            width=width,
+            **layout_color_kwargs,
+        ),
+    )
+
+    # update traces
+    _update_figure_dict(
+        trace,
+        dict(
+            marker_line_width=0.5,
+            textposition='middle center',
+            hovertemplate='%{customdata}<extra></extra>',
+            hoverlabel={'font': {'size': 22, 'family': 'Monospace'}},
+            marker_pad={'l': 5, 'b': 5, 't': 30, 'r': 5},
+        ),
+    )
+
+    return {'data': [trace], 'layout': layout}
+
+
+# plotly properties whose names contain underscores, this must match
+# plotly.basedatatypes.BaseFigure._valid_underscore_properties
+_underscore_properties = {
+    'error_x',
+    'error_y',
+    'error_z',
+    'copy_xstyle',
+    'copy_ystyle',
+    'copy_zstyle',
+    'paper_bgcolor',
+    'plot_bgcolor',
+}
+
+
+def _update_figure_dict(
+    target: dict[str, typing.Any], updates: Mapping[str, typing.Any]
+) -> None:
+    """recursively merge updates into target, like plotly's update methods
+
+    keys may be nested with magic underscores or dots, which as in plotly are
+    applied after plain keys. string titles are converted to {'text': ...} and
+    named colorscales to lists, as plotly's validators would do. values that
+    would need more of plotly's validation are rejected
+    """
+    paths = {key: _split_property_path(key) for key in updates.keys()}
+    for key in sorted(updates.keys(), key=lambda key: len(paths[key]) > 1):
+        value = updates[key]
+        path = paths[key]
+        if value is None:
+            continue
+        if path[-1] == 'template' and not isinstance(value, dict):
+            raise ValueError('template must be a dict in figure dicts')
+        if isinstance(value, (list, tuple)) and any(
+            isinstance(item, dict) for item in value
+        ):
+            raise ValueError('lists of dicts are not supported in ' + key)
+        if path[-1] == 'title' and isinstance(value, str):
+            value = {'text': value}
+        elif path[-1] == 'colorscale' and isinstance(value, str):
+            import plotly.colors  # type: ignore
+
+            # positions computed as in plotly's ColorscaleValidator
+            scale_colors = [
+                color for _, color in plotly.colors.get_colorscale(value)
+            ]
+            value = [
+                [i / (len(scale_colors) - 1), color]
+                for i, color in enumerate(scale_colors)
+            ]
+
+        # expand path into nested dicts
+        node = target
+        for part in path[:-1]:
+            if not isinstance(node.get(part), dict):
+                node[part] = {}
+            node = node[part]
+
+        if isinstance(value, dict):
+            if not isinstance(node.get(path[-1]), dict):
+                node[path[-1]] = {}
+            _update_figure_dict(node[path[-1]], value)
+        else:
+            node[path[-1]] = value
+
+
+def _split_property_path(key: str) -> list[str]:
+    if '[' in key or ']' in key:
+        raise ValueError('array indices are not supported in ' + repr(key))
+    path: list[str] = []
+    for dotted_part in key.split('.'):
+        start = len(path)
+        for part in dotted_part.split('_'):
+            if (
+                len(path) > start
+                and path[-1] + '_' + part in _underscore_properties
+            ):
+                path[-1] = path[-1] + '_' + part
+            else:
+                path.append(part)
+    return path